@@ -0,0 +1,17 @@
+-- Migration: Serve username/email login lookups from unique indexes
+-- Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+-- SPDX-License-Identifier: MIT
+
+-- The login query is split into `WHERE username = $1 UNION ALL WHERE email = $1`
+-- so each branch is a single unique index scan. The UNIQUE constraints on
+-- users(username) and users(email) already own these indexes; make sure they
+-- exist for databases created before the constraints were added.
+-- NOTE: migrations run inside a transaction, so CONCURRENTLY cannot be used
+-- here. On a large live table, create them manually with
+-- CREATE UNIQUE INDEX CONCURRENTLY before applying this migration.
+CREATE UNIQUE INDEX IF NOT EXISTS users_username_key ON users(username);
+CREATE UNIQUE INDEX IF NOT EXISTS users_email_key ON users(email);
+
+-- The plain B-tree indexes from 001 duplicate the unique ones above
+DROP INDEX IF EXISTS idx_users_username;
+DROP INDEX IF EXISTS idx_users_email;
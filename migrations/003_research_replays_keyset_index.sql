@@ -0,0 +1,11 @@
+-- Migration: Covering index for keyset pagination of the research history list
+-- Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+-- SPDX-License-Identifier: MIT
+
+-- /api/researches pages with `(completed_at, id) < ($2, $3)` instead of OFFSET.
+-- This index matches that ORDER BY and includes the list columns so each page
+-- is an index-only scan of `limit` entries regardless of page depth.
+CREATE INDEX IF NOT EXISTS idx_research_replays_user_completed_at
+    ON research_replays(user_id, completed_at DESC, id DESC)
+    INCLUDE (thread_id, research_topic, report_style, is_completed, created_at, ts)
+    WHERE is_completed = TRUE;
@@ -0,0 +1,21 @@
+-- Migration: Track daily research usage outside the users table
+-- Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+-- SPDX-License-Identifier: MIT
+
+-- Every completed research used to run `UPDATE users SET used_today = ...`,
+-- rewriting the same row the auth endpoints read on every request. Counting in
+-- a narrow (user_id, usage_date) table keeps the users row cold, and a new day
+-- simply starts a new row instead of needing a reset job.
+CREATE TABLE IF NOT EXISTS user_daily_usage (
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    usage_date DATE NOT NULL DEFAULT CURRENT_DATE,
+    used INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, usage_date)
+);
+
+-- Carry over today's counts recorded in the legacy column
+INSERT INTO user_daily_usage (user_id, usage_date, used)
+SELECT id, CURRENT_DATE, used_today
+FROM users
+WHERE used_today > 0 AND last_reset_date = CURRENT_DATE
+ON CONFLICT (user_id, usage_date) DO NOTHING;
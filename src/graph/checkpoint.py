@@ -156,6 +156,7 @@ class ChatStreamManager:
             self.postgres_conn = psycopg.connect(db_uri, row_factory=dict_row)
             self.logger.info("Successfully connected to PostgreSQL with enhanced stability settings")
             self._create_users_table()
+            self._create_user_daily_usage_table()
             self._create_chat_streams_table()
             self._create_research_replays_table()
         except Exception as e:
@@ -180,8 +181,10 @@ class ChatStreamManager:
                     last_reset_date DATE DEFAULT CURRENT_DATE
                 );
                 
-                CREATE INDEX IF NOT EXISTS idx_users_username ON users(username);
-                CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
+                -- username/email lookups are served by the UNIQUE constraint indexes
+                -- (users_username_key, users_email_key)
+                DROP INDEX IF EXISTS idx_users_username;
+                DROP INDEX IF EXISTS idx_users_email;
                 CREATE INDEX IF NOT EXISTS idx_users_is_active ON users(is_active);
                 """
                 cursor.execute(create_table_sql)
@@ -192,6 +195,26 @@ class ChatStreamManager:
             if self.postgres_conn:
                 self.postgres_conn.rollback()
 
+    def _create_user_daily_usage_table(self) -> None:
+        """Create the user_daily_usage table if it doesn't exist."""
+        try:
+            with self.postgres_conn.cursor() as cursor:
+                create_table_sql = """
+                CREATE TABLE IF NOT EXISTS user_daily_usage (
+                    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+                    usage_date DATE NOT NULL DEFAULT CURRENT_DATE,
+                    used INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (user_id, usage_date)
+                );
+                """
+                cursor.execute(create_table_sql)
+                self.postgres_conn.commit()
+                self.logger.info("User daily usage table created/verified successfully")
+        except Exception as e:
+            self.logger.error(f"Failed to create user_daily_usage table: {e}")
+            if self.postgres_conn:
+                self.postgres_conn.rollback()
+
     def _create_chat_streams_table(self) -> None:
         """Create the chat_streams table if it doesn't exist."""
         try:
@@ -239,6 +262,10 @@ class ChatStreamManager:
                 CREATE INDEX IF NOT EXISTS idx_research_replays_is_completed ON research_replays(is_completed);
                 CREATE INDEX IF NOT EXISTS idx_research_replays_user_completed ON research_replays(user_id, is_completed);
                 CREATE INDEX IF NOT EXISTS idx_research_replays_ts ON research_replays(ts);
+                CREATE INDEX IF NOT EXISTS idx_research_replays_user_completed_at
+                    ON research_replays(user_id, completed_at DESC, id DESC)
+                    INCLUDE (thread_id, research_topic, report_style, is_completed, created_at, ts)
+                    WHERE is_completed = TRUE;
                 """
                 cursor.execute(create_table_sql)
                 self.postgres_conn.commit()
@@ -616,70 +643,112 @@ class ChatStreamManager:
             return False
     
     def _increment_user_usage(self, user_id: str) -> None:
-        """Increment user's daily usage count."""
+        """
+        Increment user's daily usage count.
+
+        Usage is counted in a narrow per-day row of ``user_daily_usage`` rather
+        than in ``users.used_today``, so research completions never rewrite the
+        users row that every auth request reads, and the count resets by date.
+        """
         try:
             with self.postgres_conn.cursor() as cursor:
                 cursor.execute(
                     """
-                    UPDATE users
-                    SET used_today = used_today + 1,
-                        updated_at = NOW()
-                    WHERE id = %s AND last_reset_date = CURRENT_DATE
+                    INSERT INTO user_daily_usage (user_id, usage_date, used)
+                    VALUES (%s, CURRENT_DATE, 1)
+                    ON CONFLICT (user_id, usage_date)
+                    DO UPDATE SET used = user_daily_usage.used + 1
                     """,
                     (user_id,),
                 )
                 self.postgres_conn.commit()
         except Exception as e:
             self.logger.error(f"Error incrementing user usage: {e}")
+            if self.postgres_conn:
+                self.postgres_conn.rollback()
     
     def get_user_researches(
-        self, user_id: str, limit: int = 20, offset: int = 0
+        self,
+        user_id: str,
+        limit: int = 20,
+        offset: int = 0,
+        after: Optional[Tuple[datetime, str]] = None,
     ) -> List[dict]:
         """
         Get completed researches for a specific user (list view, without full report).
-        
+
+        Pagination is keyset based when ``after`` is given: only rows strictly
+        older than the ``(completed_at, id)`` of the last row of the previous
+        page are returned, so deep pages cost the same as the first one.
+        ``offset`` is kept for backward compatibility and ignored when
+        ``after`` is set.
+
         Args:
             user_id: User ID
             limit: Maximum number of records to return
             offset: Number of records to skip
-            
+            after: ``(completed_at, id)`` of the last record of the previous page
+
         Returns:
             List of completed research records (metadata only, no full report/observations)
         """
         try:
             if self.postgres_conn is not None:
                 with self.postgres_conn.cursor() as cursor:
-                    cursor.execute(
-                        """
-                        SELECT id, thread_id, research_topic, report_style, 
-                               is_completed, created_at, completed_at, ts
-                        FROM research_replays
-                        WHERE user_id = %s AND is_completed = TRUE
-                        ORDER BY completed_at DESC
-                        LIMIT %s OFFSET %s
-                        """,
-                        (user_id, limit, offset),
-                    )
+                    if after is not None:
+                        cursor.execute(
+                            """
+                            SELECT id, thread_id, research_topic, report_style,
+                                   is_completed, created_at, completed_at, ts
+                            FROM research_replays
+                            WHERE user_id = %s AND is_completed = TRUE
+                              AND (completed_at, id) < (%s, %s::uuid)
+                            ORDER BY completed_at DESC, id DESC
+                            LIMIT %s
+                            """,
+                            (user_id, after[0], after[1], limit),
+                        )
+                    else:
+                        cursor.execute(
+                            """
+                            SELECT id, thread_id, research_topic, report_style,
+                                   is_completed, created_at, completed_at, ts
+                            FROM research_replays
+                            WHERE user_id = %s AND is_completed = TRUE
+                            ORDER BY completed_at DESC, id DESC
+                            LIMIT %s OFFSET %s
+                            """,
+                            (user_id, limit, offset),
+                        )
                     results = cursor.fetchall()
                     return [dict(row) for row in results]
             elif self.mongo_db is not None:
                 collection = self.mongo_db.research_replays
+                query = {"user_id": user_id, "is_completed": True}
+                if after is not None:
+                    query["$or"] = [
+                        {"completed_at": {"$lt": after[0]}},
+                        {"completed_at": after[0], "id": {"$lt": after[1]}},
+                    ]
                 cursor = (
                     collection.find(
-                        {"user_id": user_id, "is_completed": True},
+                        query,
                         {"final_report": 0, "observations": 0, "plan": 0}  # Exclude large fields
                     )
-                    .sort("completed_at", -1)
+                    .sort([("completed_at", -1), ("id", -1)])
                     .limit(limit)
-                    .skip(offset)
                 )
+                if after is None:
+                    cursor = cursor.skip(offset)
                 return list(cursor)
             else:
                 return []
         except Exception as e:
             self.logger.error(f"Error getting user researches: {e}")
+            if self.postgres_conn:
+                self.postgres_conn.rollback()
             return []
-    
+
     def get_research_report(self, thread_id: str, user_id: Optional[str] = None) -> Optional[dict]:
         """
         Get a completed research report with FULL data (observations, plan, final_report).
@@ -824,11 +893,16 @@ def save_completed_research(
     return False
 
 
-def get_user_researches(user_id: str, limit: int = 20, offset: int = 0) -> List[dict]:
+def get_user_researches(
+    user_id: str,
+    limit: int = 20,
+    offset: int = 0,
+    after: Optional[Tuple[datetime, str]] = None,
+) -> List[dict]:
     """Get user's completed researches."""
     checkpoint_saver = get_bool_env("LANGGRAPH_CHECKPOINT_SAVER", False)
     if checkpoint_saver:
-        return _default_manager.get_user_researches(user_id, limit, offset)
+        return _default_manager.get_user_researches(user_id, limit, offset, after)
     return []
 
 
@@ -4,7 +4,9 @@
 import json
 import logging
 import os
+import re
 from functools import partial
+from itertools import islice
 from typing import Annotated, Literal
 
 from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
@@ -35,6 +37,17 @@ from .types import State
 
 logger = logging.getLogger(__name__)
 
+# Section headers whose text is taken as a step's key findings, by priority
+_FINDING_SECTION_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+    for pattern in (
+        r'(?:Key Findings?|关键发现|主要发现)[:\s]*([^\n]+(?:\n(?!#)[^\n]+)*)',
+        r'(?:Conclusion|结论)[:\s]*([^\n]+(?:\n(?!#)[^\n]+)*)',
+        r'(?:Summary|摘要|总结)[:\s]*([^\n]+(?:\n(?!#)[^\n]+)*)',
+    )
+]
+_BULLET_RE = re.compile(r'[-•*]\s+([^\n]+)')
+
 
 def _format_completed_steps_with_summary(completed_steps, keep_recent_full: int = 2) -> str:
     """
@@ -52,20 +65,21 @@ def _format_completed_steps_with_summary(completed_steps, keep_recent_full: int
     Returns:
         Formatted string with completed steps information
     """
-    import re
-
     if not completed_steps:
         return ""
 
-    result = ""
+    # Blocks are collected and joined once instead of growing one string
+    parts = []
     total_steps = len(completed_steps)
 
     # Determine which steps to summarize vs keep full
     if total_steps <= keep_recent_full:
         # Few steps - keep all in full detail
         for i, step in enumerate(completed_steps):
-            result += f"## Completed Step {i + 1}: {step.title}\n\n"
-            result += f"<finding>\n{step.execution_res}\n</finding>\n\n"
+            parts.append(
+                f"## Completed Step {i + 1}: {step.title}\n\n"
+                f"<finding>\n{step.execution_res}\n</finding>\n\n"
+            )
     else:
         # Many steps - summarize older ones, keep recent ones full
         older_steps = completed_steps[:-keep_recent_full]
@@ -73,23 +87,24 @@ def _format_completed_steps_with_summary(completed_steps, keep_recent_full: int
 
         # Summarize older steps
         if older_steps:
-            result += f"## Summary of Earlier Steps (Steps 1-{len(older_steps)})\n\n"
-            result += "<finding>\n"
+            parts.append(f"## Summary of Earlier Steps (Steps 1-{len(older_steps)})\n\n")
+            parts.append("<finding>\n")
 
             for i, step in enumerate(older_steps):
                 # Extract key findings from execution_res
                 summary = _extract_key_findings(step.execution_res, max_length=500)
-                result += f"**Step {i + 1}: {step.title}**\n"
-                result += f"{summary}\n\n"
+                parts.append(f"**Step {i + 1}: {step.title}**\n{summary}\n\n")
 
-            result += "</finding>\n\n"
+            parts.append("</finding>\n\n")
 
         # Keep recent steps in full detail
         for i, step in enumerate(recent_steps, start=len(older_steps) + 1):
-            result += f"## Completed Step {i}: {step.title}\n\n"
-            result += f"<finding>\n{step.execution_res}\n</finding>\n\n"
+            parts.append(
+                f"## Completed Step {i}: {step.title}\n\n"
+                f"<finding>\n{step.execution_res}\n</finding>\n\n"
+            )
 
-    return result
+    return "".join(parts)
 
 
 def _extract_key_findings(content: str, max_length: int = 500) -> str:
@@ -106,34 +121,29 @@ def _extract_key_findings(content: str, max_length: int = 500) -> str:
     if not content or not isinstance(content, str):
         return "[No findings available]"
 
-    # Strategy 1: Look for explicit findings or conclusion sections
-    finding_patterns = [
-        r'(?:Key Findings?|关键发现|主要发现)[:\s]*([^\n]+(?:\n(?!#)[^\n]+)*)',
-        r'(?:Conclusion|结论)[:\s]*([^\n]+(?:\n(?!#)[^\n]+)*)',
-        r'(?:Summary|摘要|总结)[:\s]*([^\n]+(?:\n(?!#)[^\n]+)*)',
-    ]
-
-    for pattern in finding_patterns:
-        matches = re.findall(pattern, content, re.IGNORECASE | re.MULTILINE)
-        if matches:
+    # Strategy 1: Look for explicit findings or conclusion sections. Only the
+    # first match is used, so search() stops there instead of collecting all
+    for pattern in _FINDING_SECTION_PATTERNS:
+        match = pattern.search(content)
+        if match:
             # Take the first match and limit length
-            finding = matches[0].strip()
+            finding = match.group(1).strip()
             if len(finding) > max_length:
                 finding = finding[:max_length] + "..."
             return finding
 
-    # Strategy 2: Extract bullet points (often contain key info)
-    bullets = re.findall(r'[-•*]\s+([^\n]+)', content)
+    # Strategy 2: Extract bullet points (often contain key info); stop
+    # scanning after the first five
+    bullets = [m.group(1) for m in islice(_BULLET_RE.finditer(content), 5)]
     if bullets:
         # Take first 3-5 bullets
-        key_bullets = bullets[:min(5, len(bullets))]
-        summary = "- " + "\n- ".join(key_bullets)
+        summary = "- " + "\n- ".join(bullets)
         if len(summary) > max_length:
             summary = summary[:max_length] + "..."
         return summary
 
     # Strategy 3: Extract first and last paragraphs
-    paragraphs = [p.strip() for p in content.split('\n\n') if p.strip() and len(p.strip()) > 50]
+    paragraphs = [p for p in (p.strip() for p in content.split('\n\n')) if len(p) > 50]
     if paragraphs:
         if len(paragraphs) == 1:
             summary = paragraphs[0]
@@ -6,12 +6,12 @@ import base64
 import json
 import logging
 import os
-from typing import Annotated, Any, List, cast
-from uuid import uuid4
+from typing import Annotated, Any, AsyncIterator, List, Optional, cast
+from uuid import UUID, uuid4
 
-from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response, StreamingResponse
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from langchain_core.messages import AIMessageChunk, BaseMessage, ToolMessage
 from langgraph.checkpoint.mongodb import AsyncMongoDBSaver
 from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
@@ -21,7 +21,7 @@ import psycopg
 from psycopg_pool import AsyncConnectionPool
 
 from src.config.configuration import get_recursion_limit
-from src.config.loader import get_bool_env, get_str_env
+from src.config.loader import get_bool_env, get_int_env, get_str_env
 from src.config.report_style import ReportStyle
 from src.config.tools import SELECTED_RAG_PROVIDER
 from src.auth.dependencies import get_current_user, get_current_user_optional
@@ -85,6 +85,7 @@ app = FastAPI(
     title="DeerFlow API",
     description="API for Deer",
     version="0.1.0",
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware
@@ -843,53 +844,104 @@ async def config():
 # Authentication APIs
 # ============================================================
 
+_auth_pool_lock = asyncio.Lock()
+
+
+def _get_auth_db_url() -> str:
+    """Return the auth database URL with sslmode enforced (required for Railway)."""
+    db_url = get_str_env("LANGGRAPH_CHECKPOINT_DB_URL")
+    if "sslmode" not in db_url:
+        separator = "&" if "?" in db_url else "?"
+        db_url = f"{db_url}{separator}sslmode=require"
+    return db_url
+
+
+async def _get_auth_pool(request: Request) -> AsyncConnectionPool:
+    """Return the auth connection pool stored on app state, opening it on first use."""
+    pool = getattr(request.app.state, "auth_db_pool", None)
+    if pool is None:
+        async with _auth_pool_lock:
+            pool = getattr(request.app.state, "auth_db_pool", None)
+            if pool is None:
+                pool = AsyncConnectionPool(
+                    _get_auth_db_url(),
+                    min_size=get_int_env("DB_POOL_MIN_SIZE", 5),
+                    max_size=get_int_env("DB_POOL_MAX_SIZE", 20),
+                    timeout=get_int_env("DB_POOL_TIMEOUT", 30),
+                    max_idle=get_int_env("DB_POOL_MAX_IDLE", 300),
+                    check=AsyncConnectionPool.check_connection,
+                    # The auth queries are a handful of fixed statements on
+                    # long-lived pooled connections: prepare them on first use.
+                    kwargs={
+                        "prepare_threshold": get_int_env("DB_PREPARE_THRESHOLD", 0)
+                    },
+                    open=False,
+                )
+                await pool.open()
+                request.app.state.auth_db_pool = pool
+    return pool
+
+
+async def get_db_conn(request: Request) -> AsyncIterator[psycopg.AsyncConnection]:
+    """FastAPI dependency yielding a pooled async PostgreSQL connection."""
+    pool = await _get_auth_pool(request)
+    async with pool.connection() as conn:
+        yield conn
+
+
+@app.on_event("shutdown")
+async def close_auth_pool():
+    """Close the auth connection pool if it was opened."""
+    pool = getattr(app.state, "auth_db_pool", None)
+    if pool is not None:
+        await pool.close()
+
+
 @app.post("/api/auth/register", response_model=AuthResponse)
-async def register(request: RegisterRequest):
+async def register(
+    request: RegisterRequest, conn: psycopg.AsyncConnection = Depends(get_db_conn)
+):
     """User registration endpoint."""
     try:
-        db_url = get_str_env("LANGGRAPH_CHECKPOINT_DB_URL")
-        
-        # Add SSL mode to connection URL if not already present (required for Railway)
-        if "sslmode" not in db_url:
-            separator = "&" if "?" in db_url else "?"
-            db_url = f"{db_url}{separator}sslmode=require"
-        
-        with psycopg.connect(db_url) as conn:
-            with conn.cursor() as cur:
-                # Check if username or email already exists
-                cur.execute(
-                    "SELECT id FROM users WHERE username = %s OR email = %s",
-                    (request.username, request.email),
-                )
-                if cur.fetchone():
-                    raise HTTPException(
-                        status_code=400,
-                        detail="Username or email already exists"
-                    )
-                
-                # Create user
-                password_hash = hash_password(request.password)
-                cur.execute(
-                    """
-                    INSERT INTO users (username, email, password_hash, display_name)
-                    VALUES (%s, %s, %s, %s)
-                    RETURNING id, username, display_name
-                    """,
-                    (request.username, request.email, password_hash, request.display_name),
+        async with conn.cursor() as cur:
+            # Check if username or email already exists
+            await cur.execute(
+                "SELECT 1 FROM users WHERE username = %s OR email = %s LIMIT 1",
+                (request.username, request.email),
+            )
+            if await cur.fetchone():
+                raise HTTPException(
+                    status_code=400,
+                    detail="Username or email already exists"
                 )
-                
-                user = cur.fetchone()
-                conn.commit()
-                
-                # Generate JWT token
-                token = create_access_token(str(user[0]), user[1])
-                
-                return AuthResponse(
+
+            # Create user
+            password_hash = await asyncio.to_thread(hash_password, request.password)
+            await cur.execute(
+                """
+                INSERT INTO users (username, email, password_hash, display_name)
+                VALUES (%s, %s, %s, %s)
+                RETURNING id::text, username, display_name
+                """,
+                (request.username, request.email, password_hash, request.display_name),
+            )
+
+            user = await cur.fetchone()
+            await conn.commit()
+
+            # Generate JWT token
+            token = create_access_token(user[0], user[1])
+
+            # Return the response directly so FastAPI does not re-validate it
+            # against response_model
+            return ORJSONResponse(
+                AuthResponse(
                     access_token=token,
-                    user_id=str(user[0]),
+                    user_id=user[0],
                     username=user[1],
                     display_name=user[2],
-                )
+                ).model_dump()
+            )
     except HTTPException:
         raise
     except Exception as e:
@@ -898,61 +950,68 @@ async def register(request: RegisterRequest):
 
 
 @app.post("/api/auth/login", response_model=AuthResponse)
-async def login(request: LoginRequest):
+async def login(
+    request: LoginRequest, conn: psycopg.AsyncConnection = Depends(get_db_conn)
+):
     """User login endpoint."""
     try:
-        db_url = get_str_env("LANGGRAPH_CHECKPOINT_DB_URL")
-        
-        # Add SSL mode to connection URL if not already present (required for Railway)
-        if "sslmode" not in db_url:
-            separator = "&" if "?" in db_url else "?"
-            db_url = f"{db_url}{separator}sslmode=require"
-        
-        with psycopg.connect(db_url) as conn:
-            with conn.cursor() as cur:
-                # Query user (support username or email login)
-                cur.execute(
-                    """
-                    SELECT id, username, password_hash, display_name, is_active
-                    FROM users
-                    WHERE username = %s OR email = %s
-                    """,
-                    (request.username, request.username),
-                )
-                
-                user = cur.fetchone()
-                
-                if not user:
-                    raise HTTPException(
-                        status_code=401,
-                        detail="Invalid credentials"
-                    )
-                
-                user_id, username, password_hash, display_name, is_active = user
-                
-                # Check account status
-                if not is_active:
-                    raise HTTPException(
-                        status_code=403,
-                        detail="Account disabled"
-                    )
-                
-                # Verify password
-                if not verify_password(request.password, password_hash):
-                    raise HTTPException(
-                        status_code=401,
-                        detail="Invalid credentials"
-                    )
-                
-                # Generate JWT token
-                token = create_access_token(str(user_id), username)
-                
-                return AuthResponse(
-                    access_token=token,
-                    user_id=str(user_id),
-                    username=username,
-                    display_name=display_name,
-                )
+        async with conn.cursor() as cur:
+            # Query user (support username or email login).
+            # UNION ALL lets each branch use its own unique index instead of
+            # a BitmapOr over both; each branch yields at most one row, and
+            # ordering by the branch priority makes username matches win.
+            await cur.execute(
+                """
+                (SELECT id::text, username, password_hash, display_name, is_active,
+                        0 AS priority
+                 FROM users WHERE username = %s)
+                UNION ALL
+                (SELECT id::text, username, password_hash, display_name, is_active,
+                        1 AS priority
+                 FROM users WHERE email = %s)
+                ORDER BY priority
+                LIMIT 1
+                """,
+                (request.username, request.username),
+            )
+
+            user = await cur.fetchone()
+
+        if not user:
+            raise HTTPException(
+                status_code=401,
+                detail="Invalid credentials"
+            )
+
+        user_id, username, password_hash, display_name, is_active, _ = user
+
+        # Check account status
+        if not is_active:
+            raise HTTPException(
+                status_code=403,
+                detail="Account disabled"
+            )
+
+        # Verify password
+        if not await asyncio.to_thread(
+            verify_password, request.password, password_hash
+        ):
+            raise HTTPException(
+                status_code=401,
+                detail="Invalid credentials"
+            )
+
+        # Generate JWT token
+        token = create_access_token(user_id, username)
+
+        return ORJSONResponse(
+            AuthResponse(
+                access_token=token,
+                user_id=user_id,
+                username=username,
+                display_name=display_name,
+            ).model_dump()
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -961,40 +1020,41 @@ async def login(request: LoginRequest):
 
 
 @app.get("/api/auth/me", response_model=UserInfo)
-async def get_user_info(user_id: str = Depends(get_current_user)):
+async def get_user_info(
+    user_id: str = Depends(get_current_user),
+    conn: psycopg.AsyncConnection = Depends(get_db_conn),
+):
     """Get current user information."""
     try:
-        db_url = get_str_env("LANGGRAPH_CHECKPOINT_DB_URL")
-        
-        # Add SSL mode to connection URL if not already present (required for Railway)
-        if "sslmode" not in db_url:
-            separator = "&" if "?" in db_url else "?"
-            db_url = f"{db_url}{separator}sslmode=require"
-        
-        with psycopg.connect(db_url) as conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    SELECT id, username, email, display_name, created_at, 
-                           daily_quota, used_today
-                    FROM users WHERE id = %s
-                    """,
-                    (user_id,),
-                )
-                
-                user = cur.fetchone()
-                if not user:
-                    raise HTTPException(status_code=404, detail="User not found")
-                
-                return UserInfo(
-                    user_id=str(user[0]),
-                    username=user[1],
-                    email=user[2],
-                    display_name=user[3],
-                    created_at=str(user[4]),
-                    daily_quota=user[5],
-                    used_today=user[6],
-                )
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                SELECT u.id::text, u.username, u.email, u.display_name,
+                       u.created_at, u.daily_quota, COALESCE(d.used, 0)
+                FROM users u
+                LEFT JOIN user_daily_usage d
+                       ON d.user_id = u.id AND d.usage_date = CURRENT_DATE
+                WHERE u.id = %s
+                """,
+                (user_id,),
+            )
+
+            user = await cur.fetchone()
+
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        return ORJSONResponse(
+            UserInfo(
+                user_id=user[0],
+                username=user[1],
+                email=user[2],
+                display_name=user[3],
+                created_at=str(user[4]),
+                daily_quota=user[5],
+                used_today=user[6],
+            ).model_dump()
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -1006,16 +1066,50 @@ async def get_user_info(user_id: str = Depends(get_current_user)):
 # Research History APIs
 # ============================================================
 
+def _encode_research_cursor(research: dict) -> Optional[str]:
+    """Encode the ``(completed_at, id)`` keyset of a research row as an opaque cursor."""
+    completed_at = research.get("completed_at")
+    if completed_at is None:
+        return None
+    if isinstance(completed_at, datetime):
+        completed_at = completed_at.isoformat()
+    payload = json.dumps([completed_at, str(research.get("id"))])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def _decode_research_cursor(cursor: str) -> tuple[datetime, str]:
+    """Decode a cursor produced by ``_encode_research_cursor``."""
+    try:
+        completed_at, research_id = json.loads(base64.urlsafe_b64decode(cursor))
+        # Validate the id here: a malformed one would fail the ::uuid cast in
+        # SQL. It is returned as given, since MongoDB compares ids as strings
+        UUID(research_id)
+        return datetime.fromisoformat(completed_at), research_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
 @app.get("/api/researches")
 async def get_researches(
     limit: int = 20,
     offset: int = 0,
+    after: Optional[str] = None,
     user_id: str = Depends(get_current_user),
 ):
-    """Get user's completed research list."""
+    """Get user's completed research list.
+
+    Pass the returned ``next_cursor`` as ``after`` to fetch the next page;
+    ``offset`` is still accepted for older clients.
+    """
+    keyset = _decode_research_cursor(after) if after else None
     try:
-        researches = get_user_researches(user_id, limit, offset)
-        return {"data": researches}
+        researches = get_user_researches(user_id, limit, offset, keyset)
+        next_cursor = (
+            _encode_research_cursor(researches[-1])
+            if researches and len(researches) == limit
+            else None
+        )
+        return {"data": researches, "next_cursor": next_cursor}
     except Exception as e:
         logger.exception(f"Error getting researches: {str(e)}")
         raise HTTPException(status_code=500, detail=INTERNAL_SERVER_ERROR_DETAIL)
@@ -1,11 +1,14 @@
 # src/utils/token_manager.py
-import copy
-import json
 import logging
+import os
 import re
-from typing import List, Optional
-from functools import lru_cache
+import threading
+import weakref
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+from functools import cached_property, lru_cache, partial
 
+import orjson
 from langchain_core.messages import (
     AIMessage,
     BaseMessage,
@@ -27,6 +30,139 @@ except ImportError:
     TIKTOKEN_AVAILABLE = False
     logger.warning("tiktoken not available, falling back to character-based estimation")
 
+# Optional Rust tokenizer with a tiktoken-compatible API and a count-only path
+try:
+    import runtoken
+    RUNTOKEN_AVAILABLE = True
+except ImportError:
+    RUNTOKEN_AVAILABLE = False
+
+
+_FINDING_RE = re.compile(r'<finding>(.*?)</finding>', re.DOTALL)
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]\s+')
+_JSON_CONTAINER_START_RE = re.compile(r'\s*[\[{]')
+_TRUNCATION_MARKER = "... [truncated]"
+# Fields kept first when compressing a JSON object (common important fields)
+_PRIORITY_JSON_FIELDS = ("url", "title", "type", "score", "id", "name", "message", "error")
+
+
+def _load_fast_encoder(name: str):
+    """Load ``name`` with runtoken if it is installed, otherwise return None"""
+    if not RUNTOKEN_AVAILABLE:
+        return None
+    try:
+        return runtoken.get_encoding(name)
+    except Exception as e:
+        logger.warning(f"Failed to initialize runtoken encoding {name}: {e}")
+        return None
+
+
+# Encodings loaded so far, by name. Only successful loads are kept, so a
+# transient failure (e.g. the vocabulary download) is retried next time
+_SHARED_ENCODINGS: Dict[str, object] = {}
+
+
+def _get_shared_encoding(name: str):
+    """
+    Load an encoding once per process and share it between ContextManagers
+
+    Loading parses the whole BPE vocabulary, so it must not be repeated for
+    every ContextManager instance. Failed loads are not cached.
+
+    Args:
+        name: Encoding name, e.g. "o200k_base"
+
+    Returns:
+        Encoding object, or None if it could not be loaded
+    """
+    encoding = _SHARED_ENCODINGS.get(name)
+    if encoding is not None:
+        return encoding
+
+    encoding = _load_fast_encoder(name)
+    if encoding is not None:
+        logger.info(f"Using runtoken {name} encoding")
+        _SHARED_ENCODINGS[name] = encoding
+        return encoding
+
+    if not TIKTOKEN_AVAILABLE:
+        return None
+
+    try:
+        encoding = tiktoken.get_encoding(name)
+        logger.info(f"Using tiktoken {name} encoding")
+        _SHARED_ENCODINGS[name] = encoding
+        return encoding
+    except Exception as e:
+        logger.warning(f"Failed to initialize tiktoken encoding {name}: {e}")
+        return None
+
+
+# Texts up to this length are memoized in _count_tokens_cached; role names,
+# system prompts, tool-call templates and truncation markers recur constantly
+_TEXT_TOKEN_CACHE_MAX_CHARS = 4096
+
+
+def _count_tokens_with(encoding, text: str) -> int:
+    """Count tokens of ``text`` with ``encoding``, preferring a count-only API"""
+    count = getattr(encoding, "count", None)
+    if count is not None:
+        return count(text)
+    # encode_ordinary skips special-token handling altogether; it yields the
+    # same tokens as encode(text, disallowed_special=())
+    encode_ordinary = getattr(encoding, "encode_ordinary", None)
+    if encode_ordinary is not None:
+        return len(encode_ordinary(text))
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=4096)
+def _count_tokens_cached(encoding, text: str) -> int:
+    """Memoized ``_count_tokens_with``, keyed by encoding object and text"""
+    return _count_tokens_with(encoding, text)
+
+
+# Longer texts (tool outputs, search results) are memoized by a content hash
+# instead, so the cache never keeps the texts themselves alive
+_LONG_TEXT_TOKEN_CACHE_SIZE = 1024
+_long_text_token_cache: "OrderedDict[Tuple[object, int, int], int]" = OrderedDict()
+_long_text_token_cache_lock = threading.Lock()
+
+
+def _long_text_key(encoding, text: str) -> Tuple[object, int, int]:
+    """Cache key for a long text: encoding, length and str hash"""
+    return encoding, len(text), hash(text)
+
+
+def _get_long_text_tokens(key: Tuple[object, int, int]) -> Optional[int]:
+    """Look up a long text's token count, marking it recently used"""
+    with _long_text_token_cache_lock:
+        count = _long_text_token_cache.get(key)
+        if count is not None:
+            _long_text_token_cache.move_to_end(key)
+        return count
+
+
+def _put_long_text_tokens(key: Tuple[object, int, int], count: int) -> None:
+    """Store a long text's token count, evicting the least recently used"""
+    with _long_text_token_cache_lock:
+        _long_text_token_cache[key] = count
+        _long_text_token_cache.move_to_end(key)
+        if len(_long_text_token_cache) > _LONG_TEXT_TOKEN_CACHE_SIZE:
+            _long_text_token_cache.popitem(last=False)
+
+
+# Token counts per message, keyed by id(message), one dict per encoding. They
+# are shared across ContextManager instances because callers build a new
+# manager per model call. Entries are evicted when the message is garbage
+# collected, so an id is never reused stale.
+_MESSAGE_TOKEN_CACHES: Dict[object, Dict[int, int]] = {}
+
+
+def _json_dumps(data) -> str:
+    """Serialize ``data`` compactly with orjson, keeping non-ASCII as-is"""
+    return orjson.dumps(data).decode()
+
 
 def get_search_config():
     config = load_yaml_config("conf.yaml")
@@ -58,34 +194,36 @@ class ContextManager:
         self.enable_smart_summary = enable_smart_summary
         self.sliding_window_size = sliding_window_size
 
-        # Initialize tiktoken encoding
-        self._encoding = self._init_tiktoken_encoding()
+        # Batches with fewer long texts than this are encoded inline: starting
+        # encoder threads costs more than it saves on small batches
+        self.encode_parallel_threshold = 32
 
-    @lru_cache(maxsize=1)
-    def _init_tiktoken_encoding(self):
-        """Initialize tiktoken encoding with caching"""
-        if not TIKTOKEN_AVAILABLE:
-            return None
+    @cached_property
+    def _encoding(self):
+        """Encoding used for counting, loaded on first use rather than in __init__"""
+        return self._init_tiktoken_encoding()
 
-        try:
-            # Try o200k_base first (supports GPT-5, GPT-4o, etc.)
-            encoding = tiktoken.get_encoding("o200k_base")
-            logger.info("Using o200k_base encoding (supports GPT-5-Nano)")
-            return encoding
-        except Exception:
-            try:
-                # Fallback to cl100k_base (supports GPT-4, GPT-3.5-turbo)
-                encoding = tiktoken.get_encoding("cl100k_base")
-                logger.info("Using cl100k_base encoding (fallback)")
+    @cached_property
+    def _msg_token_cache(self) -> Dict[int, int]:
+        """Per-message token counts shared by all managers on this encoding"""
+        return _MESSAGE_TOKEN_CACHES.setdefault(self._encoding, {})
+
+    def _init_tiktoken_encoding(self):
+        """Get the shared encoding: o200k_base, falling back to cl100k_base"""
+        # o200k_base supports GPT-5, GPT-4o, etc.; cl100k_base GPT-4, GPT-3.5-turbo
+        for name in ("o200k_base", "cl100k_base"):
+            encoding = _get_shared_encoding(name)
+            if encoding is not None:
                 return encoding
-            except Exception as e:
-                logger.warning(f"Failed to initialize tiktoken encoding: {e}")
-                return None
+        return None
 
     def count_tokens(self, messages: List[BaseMessage]) -> int:
         """
         Count tokens in message list
 
+        Messages without a cached count are tokenized together in one batch
+        call instead of one encoder call per text fragment.
+
         Args:
             messages: List of messages
 
@@ -93,11 +231,63 @@ class ContextManager:
             Number of tokens
         """
         total_tokens = 0
+        pending = []
         for message in messages:
-            total_tokens += self._count_message_tokens(message)
+            cached = self._msg_token_cache.get(id(message))
+            if cached is None:
+                pending.append(message)
+            else:
+                total_tokens += cached
+
+        if not pending:
+            return total_tokens
+
+        # Flatten the fragments of all pending messages, remembering where
+        # each message's fragments start so the counts can be split back
+        fragments: List[str] = []
+        offsets = [0]
+        for message in pending:
+            fragments.extend(self._collect_text_fragments(message))
+            offsets.append(len(fragments))
+
+        fragment_counts = self._count_text_tokens_batch(fragments)
+        for i, message in enumerate(pending):
+            token_count = self._combine_fragment_counts(
+                message, fragment_counts[offsets[i]:offsets[i + 1]]
+            )
+            self._cache_message_tokens(message, token_count)
+            total_tokens += token_count
         return total_tokens
 
     def _count_message_tokens(self, message: BaseMessage) -> int:
+        """
+        Count tokens in a single message, memoized per message object
+
+        Messages are treated as immutable: the count computed for a message
+        object is reused until that object is garbage collected.
+
+        Args:
+            message: Message object
+
+        Returns:
+            Number of tokens
+        """
+        cached = self._msg_token_cache.get(id(message))
+        if cached is not None:
+            return cached
+
+        token_count = self._compute_message_tokens(message)
+        self._cache_message_tokens(message, token_count)
+        return token_count
+
+    def _cache_message_tokens(self, message: BaseMessage, token_count: int) -> None:
+        """Store a message's token count until the message is garbage collected"""
+        key = id(message)
+        if key not in self._msg_token_cache:
+            weakref.finalize(message, self._msg_token_cache.pop, key, None)
+        self._msg_token_cache[key] = token_count
+
+    def _compute_message_tokens(self, message: BaseMessage) -> int:
         """
         Count tokens in a single message with enhanced accuracy
 
@@ -107,45 +297,138 @@ class ContextManager:
         Returns:
             Number of tokens
         """
-        token_count = 0
+        fragments = self._collect_text_fragments(message)
+        return self._combine_fragment_counts(
+            message, [self._count_text_tokens(fragment) for fragment in fragments]
+        )
+
+    def _collect_text_fragments(self, message: BaseMessage) -> List[str]:
+        """
+        Collect the texts of a message that contribute to its token count
+
+        The first two fragments are always the content and the role (empty
+        strings when absent) and are scaled by the per-type multiplier in
+        ``_combine_fragment_counts``. Tool calls and additional_kwargs are
+        rendered once into a single third fragment, added unscaled, so each
+        message costs at most three encoder inputs.
+
+        Args:
+            message: Message object
+
+        Returns:
+            List of text fragments
+        """
+        content = ""
+        if hasattr(message, "content") and isinstance(message.content, str):
+            content = message.content
+        fragments = [content, getattr(message, "type", "") or ""]
+
+        payload = []
+        # AI messages may carry tool calls
+        if isinstance(message, AIMessage) and message.tool_calls:
+            payload.extend(str(tool_call) for tool_call in message.tool_calls)
+
+        # Process additional information in additional_kwargs
+        if hasattr(message, "additional_kwargs") and message.additional_kwargs:
+            payload.append(str(message.additional_kwargs))
+
+        if payload:
+            fragments.append("\n".join(payload))
+
+        return fragments
+
+    def _combine_fragment_counts(
+        self, message: BaseMessage, fragment_counts: List[int]
+    ) -> int:
+        """
+        Combine per-fragment token counts into a message token count
+
+        Args:
+            message: Message the fragments were collected from
+            fragment_counts: Token counts of ``_collect_text_fragments(message)``
+
+        Returns:
+            Number of tokens
+        """
+        # Content and role tokens
+        token_count = int(
+            (fragment_counts[0] + fragment_counts[1]) * self._message_multiplier(message)
+        )
 
-        # Count tokens in content field
-        if hasattr(message, "content") and message.content:
-            if isinstance(message.content, str):
-                token_count += self._count_text_tokens(message.content)
+        # Tool calls and additional_kwargs
+        token_count += sum(fragment_counts[2:])
 
-        # Count role-related tokens
-        if hasattr(message, "type"):
-            token_count += self._count_text_tokens(message.type)
+        # Ensure at least 1 token
+        return max(1, token_count)
 
+    def _message_multiplier(self, message: BaseMessage) -> float:
+        """Scale applied to a message's content and role tokens"""
         # Enhanced handling for different message types with realistic multipliers
         if isinstance(message, SystemMessage):
             # System messages are important but usually short
-            token_count = int(token_count * 1.05)
-        elif isinstance(message, HumanMessage):
-            # Human messages use normal estimation
-            pass
+            return 1.05
         elif isinstance(message, AIMessage):
             # AI messages may contain reasoning content and tool calls
-            token_count = int(token_count * 1.15)
-
-            # Handle tool calls in additional_kwargs
-            if hasattr(message, "tool_calls") and message.tool_calls:
-                # More accurate estimation for tool calls
-                for tool_call in message.tool_calls:
-                    token_count += self._count_text_tokens(str(tool_call))
-
+            return 1.15
         elif isinstance(message, ToolMessage):
             # Tool messages often contain structured data
-            token_count = int(token_count * 1.2)
+            return 1.2
+        return 1.0
 
-        # Process additional information in additional_kwargs
-        if hasattr(message, "additional_kwargs") and message.additional_kwargs:
-            extra_str = str(message.additional_kwargs)
-            token_count += self._count_text_tokens(extra_str)
+    def _count_text_tokens_batch(self, texts: List[str]) -> List[int]:
+        """
+        Count tokens for several texts, encoding large batches in parallel
 
-        # Ensure at least 1 token
-        return max(1, token_count)
+        Args:
+            texts: Texts to count tokens for
+
+        Returns:
+            Number of tokens for each text, in order
+        """
+        # Count-only encoders avoid materializing token lists entirely
+        if getattr(self._encoding, "count", None) is not None:
+            return [self._count_text_tokens(text) for text in texts]
+
+        if self._encoding is not None and hasattr(
+            self._encoding, "encode_ordinary_batch"
+        ):
+            # Texts are answered from the text-level caches where possible;
+            # only uncached long ones go to the encoder, in one multi-threaded
+            # batch call once there are enough of them
+            counts = [0] * len(texts)
+            long_indices = []
+            for i, text in enumerate(texts):
+                if len(text) <= _TEXT_TOKEN_CACHE_MAX_CHARS:
+                    counts[i] = self._count_text_tokens(text)
+                    continue
+                cached = _get_long_text_tokens(_long_text_key(self._encoding, text))
+                if cached is None:
+                    long_indices.append(i)
+                else:
+                    counts[i] = cached
+
+            if len(long_indices) < self.encode_parallel_threshold:
+                for i in long_indices:
+                    counts[i] = self._count_text_tokens(texts[i])
+                return counts
+
+            # About eight texts per thread, capped at the number of cores
+            num_threads = min(os.cpu_count() or 1, max(1, len(long_indices) // 8))
+            try:
+                encoded = self._encoding.encode_ordinary_batch(
+                    [texts[i] for i in long_indices],
+                    num_threads=num_threads,
+                )
+                for i, tokens in zip(long_indices, encoded):
+                    counts[i] = len(tokens)
+                    _put_long_text_tokens(
+                        _long_text_key(self._encoding, texts[i]), counts[i]
+                    )
+                return counts
+            except Exception as e:
+                logger.warning(f"tiktoken batch encoding failed, counting one by one: {e}")
+
+        return [self._count_text_tokens(text) for text in texts]
 
     def _count_text_tokens(self, text: str) -> int:
         """
@@ -161,9 +444,17 @@ class ContextManager:
             return 0
 
         # Use tiktoken if available (much more accurate)
-        if TIKTOKEN_AVAILABLE and self._encoding is not None:
+        if self._encoding is not None:
             try:
-                return len(self._encoding.encode(text, disallowed_special=()))
+                if len(text) <= _TEXT_TOKEN_CACHE_MAX_CHARS:
+                    return _count_tokens_cached(self._encoding, text)
+
+                key = _long_text_key(self._encoding, text)
+                count = _get_long_text_tokens(key)
+                if count is None:
+                    count = _count_tokens_with(self._encoding, text)
+                    _put_long_text_tokens(key, count)
+                return count
             except Exception as e:
                 logger.warning(f"tiktoken encoding failed, falling back to estimation: {e}")
                 # Fall through to character-based estimation
@@ -184,15 +475,15 @@ class ContextManager:
         if not text:
             return 0
 
-        english_chars = 0
-        non_english_chars = 0
+        # str.isascii() reads a flag CPython keeps on the string object, so
+        # pure-ASCII text needs no scan at all
+        if text.isascii():
+            return len(text) // 4
 
-        for char in text:
-            # Check if character is ASCII (English letters, digits, punctuation)
-            if ord(char) < 128:
-                english_chars += 1
-            else:
-                non_english_chars += 1
+        # ASCII characters (English letters, digits, punctuation), counted in C
+        # by dropping everything else during encoding
+        english_chars = len(text.encode("ascii", "ignore"))
+        non_english_chars = len(text) - english_chars
 
         # Calculate tokens: English at 4 chars/token, others at 1 char/token
         english_tokens = english_chars // 4
@@ -210,7 +501,28 @@ class ContextManager:
         Returns:
             Whether limit is exceeded
         """
-        return self.count_tokens(messages) > self.token_limit
+        return self._count_tokens_capped(messages, self.token_limit)[1]
+
+    def _count_tokens_capped(
+        self, messages: List[BaseMessage], cap: int
+    ) -> Tuple[int, bool]:
+        """
+        Sum message tokens, stopping as soon as the running total exceeds cap
+
+        Args:
+            messages: List of messages
+            cap: Token count above which counting stops
+
+        Returns:
+            (total, over): the running total when counting stopped, and whether
+            it exceeded cap (total is then a lower bound, not the full count)
+        """
+        total_tokens = 0
+        for message in messages:
+            total_tokens += self._count_message_tokens(message)
+            if total_tokens > cap:
+                return total_tokens, True
+        return total_tokens, False
 
     def compress_messages(self, state: dict) -> dict:
         """
@@ -231,26 +543,52 @@ class ContextManager:
             logger.warning("No messages found in state")
             return state
 
-        messages = state["messages"]
+        state["messages"], _ = self.fit_messages_to_budget(state["messages"])
+        return state
 
-        if not self.is_over_limit(messages):
-            return state
+    def fit_messages_to_budget(
+        self, messages: List[BaseMessage], token_limit: Optional[int] = None
+    ) -> Tuple[List[BaseMessage], int]:
+        """
+        Compress messages to fit a token budget and report the resulting size
+
+        Counting and compression share one tokenization pass, so callers that
+        need the token count of the result don't have to count it again.
 
-        # Apply intelligent compression
-        compressed_messages = self._intelligent_compress(messages)
+        Args:
+            messages: List of messages
+            token_limit: Token budget, defaults to the manager's token_limit
+
+        Returns:
+            The messages that fit (the original list when nothing needs
+            compressing) and their token count
+        """
+        if token_limit is None:
+            token_limit = self.token_limit
 
+        # Every message gets counted either way (all of them to confirm the
+        # list fits, or all of them again in _intelligent_compress), so count
+        # uncached ones in one batch rather than stopping early at the limit
         original_tokens = self.count_tokens(messages)
-        compressed_tokens = self.count_tokens(compressed_messages)
+        if token_limit is None or original_tokens <= token_limit:
+            return messages, original_tokens
+
+        # Apply intelligent compression; the totals come from the counts it
+        # already computed, so logging costs no extra tokenization
+        compressed_messages, original_tokens, compressed_tokens = (
+            self._intelligent_compress(messages, token_limit)
+        )
 
         logger.info(
             f"Message compression completed: {original_tokens} -> {compressed_tokens} tokens "
             f"(reduction: {((original_tokens - compressed_tokens) / original_tokens * 100):.1f}%)"
         )
 
-        state["messages"] = compressed_messages
-        return state
+        return compressed_messages, compressed_tokens
 
-    def _intelligent_compress(self, messages: List[BaseMessage]) -> List[BaseMessage]:
+    def _intelligent_compress(
+        self, messages: List[BaseMessage], token_limit: Optional[int] = None
+    ) -> Tuple[List[BaseMessage], int, int]:
         """
         Intelligent compression with multiple strategies
 
@@ -261,21 +599,30 @@ class ContextManager:
 
         Args:
             messages: List of messages to compress
+            token_limit: Token budget, defaults to the manager's token_limit
 
         Returns:
-            Compressed message list
+            Compressed message list, and the token totals of the original and
+            the compressed list
         """
         if not messages:
-            return messages
+            return messages, 0, 0
 
-        available_tokens = self.token_limit
+        if token_limit is None:
+            token_limit = self.token_limit
+        available_tokens = token_limit
         result_messages = []
 
+        # Tokenize every message once, in a single batched pass; all decisions
+        # below are arithmetic on these counts
+        original_tokens = self.count_tokens(messages)
+        counts = [self._count_message_tokens(msg) for msg in messages]
+
         # Strategy 1: Preserve prefix messages (system prompts, initial context)
         prefix_count = min(self.preserve_prefix_message_count, len(messages))
         for i in range(prefix_count):
             msg = messages[i]
-            msg_tokens = self._count_message_tokens(msg)
+            msg_tokens = counts[i]
 
             if available_tokens >= msg_tokens:
                 result_messages.append(msg)
@@ -284,36 +631,43 @@ class ContextManager:
                 # Truncate if needed
                 truncated_msg = self._truncate_message_content(msg, available_tokens)
                 result_messages.append(truncated_msg)
-                return result_messages  # No more space
+                compressed_tokens = (
+                    token_limit - available_tokens
+                    + self._count_message_tokens(truncated_msg)
+                )
+                return result_messages, original_tokens, compressed_tokens  # No more space
             else:
                 break
 
         # Strategy 2: Process remaining messages with sliding window
-        remaining_messages = messages[prefix_count:]
-
-        if not remaining_messages:
-            return result_messages
-
-        # Reserve space for recent messages (sliding window)
-        recent_messages = remaining_messages[-self.sliding_window_size:]
-        older_messages = remaining_messages[:-self.sliding_window_size] if len(remaining_messages) > self.sliding_window_size else []
-
-        # Calculate tokens needed for recent messages
-        recent_tokens_needed = sum(self._count_message_tokens(msg) for msg in recent_messages)
+        if prefix_count >= len(messages):
+            return result_messages, original_tokens, token_limit - available_tokens
+
+        # Reserve space for recent messages (sliding window): messages[split:]
+        # are recent, messages[prefix_count:split] are older. A window of 0
+        # keeps all remaining messages in the window, as slicing [-0:] did.
+        if self.sliding_window_size > 0:
+            split = max(prefix_count, len(messages) - self.sliding_window_size)
+        else:
+            split = prefix_count
 
-        # Allocate tokens: 60% for older messages, 40% for recent messages
+        # Allocate 60% of the remaining tokens to older messages; the rest is
+        # left for the recent messages (sliding window)
         older_budget = int(available_tokens * 0.6)
-        recent_budget = available_tokens - older_budget
 
         # Process older messages with summarization
-        if older_messages and older_budget > 0:
-            compressed_older = self._compress_older_messages(older_messages, older_budget)
+        if split > prefix_count and older_budget > 0:
+            compressed_older, older_tokens = self._compress_older_messages(
+                messages[prefix_count:split], older_budget, counts[prefix_count:split]
+            )
             result_messages.extend(compressed_older)
-            available_tokens -= sum(self._count_message_tokens(msg) for msg in compressed_older)
+            available_tokens -= older_tokens
 
         # Add recent messages (sliding window)
-        for msg in recent_messages:
-            msg_tokens = self._count_message_tokens(msg)
+        truncated_tokens = 0
+        for i in range(split, len(messages)):
+            msg = messages[i]
+            msg_tokens = counts[i]
 
             if available_tokens >= msg_tokens:
                 result_messages.append(msg)
@@ -322,36 +676,44 @@ class ContextManager:
                 # Truncate if space is limited
                 truncated_msg = self._truncate_message_content(msg, available_tokens)
                 result_messages.append(truncated_msg)
+                truncated_tokens = self._count_message_tokens(truncated_msg)
                 break
             else:
                 # No more space
                 break
 
-        return result_messages
+        compressed_tokens = token_limit - available_tokens + truncated_tokens
+        return result_messages, original_tokens, compressed_tokens
 
     def _compress_older_messages(
         self,
         messages: List[BaseMessage],
-        token_budget: int
-    ) -> List[BaseMessage]:
+        token_budget: int,
+        counts: Optional[List[int]] = None,
+    ) -> Tuple[List[BaseMessage], int]:
         """
         Compress older messages with intelligent summarization
 
         Args:
             messages: Older messages to compress
             token_budget: Token budget for these messages
+            counts: Precomputed token counts of ``messages``, if available
 
         Returns:
-            Compressed older messages
+            Compressed older messages and the tokens they use
         """
         if not messages or token_budget <= 0:
-            return []
+            return [], 0
 
-        compressed = []
+        if counts is None:
+            counts = [self._count_message_tokens(msg) for msg in messages]
+
+        compressed: deque = deque()
         remaining_budget = token_budget
+        used_tokens = 0
 
-        for msg in reversed(messages):  # Process from newest to oldest
-            msg_tokens = self._count_message_tokens(msg)
+        # Process from newest to oldest
+        for msg, msg_tokens in zip(reversed(messages), reversed(counts)):
 
             # For ToolMessages and very long messages, apply aggressive compression
             if isinstance(msg, ToolMessage) or msg_tokens > 1000:
@@ -360,28 +722,33 @@ class ContextManager:
                     summarized_tokens = self._count_message_tokens(summarized_msg)
 
                     if remaining_budget >= summarized_tokens:
-                        compressed.insert(0, summarized_msg)
+                        compressed.appendleft(summarized_msg)
                         remaining_budget -= summarized_tokens
+                        used_tokens += summarized_tokens
                 else:
                     # Truncate instead of summarize
                     if remaining_budget > 0:
                         truncated_msg = self._truncate_message_content(msg, min(msg_tokens // 3, remaining_budget))
-                        compressed.insert(0, truncated_msg)
-                        remaining_budget -= self._count_message_tokens(truncated_msg)
+                        truncated_tokens = self._count_message_tokens(truncated_msg)
+                        compressed.appendleft(truncated_msg)
+                        remaining_budget -= truncated_tokens
+                        used_tokens += truncated_tokens
             else:
                 # Keep shorter messages if budget allows
                 if remaining_budget >= msg_tokens:
-                    compressed.insert(0, msg)
+                    compressed.appendleft(msg)
                     remaining_budget -= msg_tokens
+                    used_tokens += msg_tokens
                 elif remaining_budget > 0:
                     truncated_msg = self._truncate_message_content(msg, remaining_budget)
-                    compressed.insert(0, truncated_msg)
+                    compressed.appendleft(truncated_msg)
                     remaining_budget = 0
+                    used_tokens += self._count_message_tokens(truncated_msg)
 
             if remaining_budget <= 0:
                 break
 
-        return compressed
+        return list(compressed), used_tokens
 
     def _summarize_message(self, message: BaseMessage, max_tokens: int = 300) -> BaseMessage:
         """
@@ -394,35 +761,42 @@ class ContextManager:
         Returns:
             Summarized message
         """
-        summarized_msg = copy.deepcopy(message)
-
         if not message.content or not isinstance(message.content, str):
-            return summarized_msg
+            return message.model_copy()
 
         content = message.content
 
         # Check if content is JSON - if so, use smart JSON compression
         json_compressed = self._try_compress_json(content, max_tokens)
         if json_compressed is not None:
-            summarized_msg.content = json_compressed
-            return summarized_msg
+            return message.model_copy(update={"content": json_compressed})
 
         # Strategy: Extract key information patterns
         summary_parts = []
 
-        # Extract findings in <finding> tags
-        findings = re.findall(r'<finding>(.*?)</finding>', content, re.DOTALL)
-        if findings:
+        # Extract findings in <finding> tags; only the first and last are
+        # kept, so track them while scanning instead of collecting every match
+        first_finding = last_finding = None
+        finding_count = 0
+        for match in _FINDING_RE.finditer(content):
+            if first_finding is None:
+                first_finding = match.group(1)
+            last_finding = match.group(1)
+            finding_count += 1
+
+        if finding_count:
             # Keep first and last finding, summarize middle ones
-            if len(findings) <= 2:
-                summary_parts.extend(findings)
+            if finding_count == 1:
+                summary_parts.append(first_finding)
+            elif finding_count == 2:
+                summary_parts.extend([first_finding, last_finding])
             else:
-                summary_parts.append(findings[0][:500])  # First finding (truncated)
-                summary_parts.append(f"[... {len(findings) - 2} findings omitted ...]")
-                summary_parts.append(findings[-1][:500])  # Last finding (truncated)
+                summary_parts.append(first_finding[:500])  # First finding (truncated)
+                summary_parts.append(f"[... {finding_count - 2} findings omitted ...]")
+                summary_parts.append(last_finding[:500])  # Last finding (truncated)
         else:
             # No findings tags, extract key sentences
-            sentences = re.split(r'[.!?]\s+', content)
+            sentences = _SENTENCE_SPLIT_RE.split(content)
 
             # Keep first 2 and last 2 sentences
             if len(sentences) <= 4:
@@ -435,17 +809,16 @@ class ContextManager:
         # Combine summary
         summary_content = " ".join(summary_parts)
 
-        # Truncate to max_tokens
-        estimated_tokens = self._count_text_tokens(summary_content)
+        # Truncate to max_tokens. The cut is a character ratio anyway, so a
+        # character estimate drives it; the caller counts the result exactly
+        estimated_tokens = self._estimate_tokens_by_chars(summary_content)
         if estimated_tokens > max_tokens:
             # Rough truncation based on character ratio
             char_limit = int(len(summary_content) * (max_tokens / estimated_tokens))
-            summary_content = summary_content[:char_limit] + "... [truncated]"
+            summary_content = summary_content[:char_limit] + _TRUNCATION_MARKER
 
         # Add summary marker
-        summarized_msg.content = f"[SUMMARIZED] {summary_content}"
-
-        return summarized_msg
+        return message.model_copy(update={"content": f"[SUMMARIZED] {summary_content}"})
 
     def _truncate_message_content(
         self, message: BaseMessage, max_tokens: int
@@ -460,29 +833,95 @@ class ContextManager:
         Returns:
             New message instance with truncated content
         """
-        # Create a deep copy of the original message to preserve all attributes
-        truncated_message = copy.deepcopy(message)
-
+        # Shallow copies keep all attributes; only the content is replaced, so
+        # the original's additional_kwargs and metadata are shared, not cloned
         if not message.content or not isinstance(message.content, str):
-            return truncated_message
+            return message.model_copy()
 
         # Check if content is JSON - if so, use smart JSON compression
         json_compressed = self._try_compress_json(message.content, max_tokens)
         if json_compressed is not None:
-            truncated_message.content = json_compressed
-            return truncated_message
+            return message.model_copy(update={"content": json_compressed})
 
-        # Estimate character limit based on token limit
-        # Use conservative ratio: assume 2 chars per token for safety
-        char_limit = max_tokens * 2
+        char_limit = self._truncation_char_limit(message, max_tokens)
 
         # Truncate content
         if len(message.content) > char_limit:
-            truncated_message.content = message.content[:char_limit] + "... [truncated]"
-        else:
-            truncated_message.content = message.content
+            return message.model_copy(
+                update={"content": message.content[:char_limit] + _TRUNCATION_MARKER}
+            )
+        return message.model_copy()
+
+    def _truncation_char_limit(self, message: BaseMessage, max_tokens: int) -> int:
+        """
+        Number of leading content characters that keep a message in max_tokens
+
+        Without an encoder this is a conservative 2 chars per token. With one,
+        the content budget left after the role, the truncation marker, the
+        type multiplier and any tool calls/kwargs is computed, and the cut is
+        made on token boundaries: the content is encoded once (only as far as
+        needed), the first tokens that fit are kept and decoded back. Dense
+        text (CJK, code) thus no longer overshoots, and English text no longer
+        loses half of its budget.
+
+        Args:
+            message: Message whose string content is truncated
+            max_tokens: Maximum number of tokens for the whole message
 
-        return truncated_message
+        Returns:
+            Character limit for the truncated content
+        """
+        if self._encoding is None or max_tokens <= 0:
+            return max_tokens * 2
+
+        content = message.content
+        encoding = self._encoding
+        try:
+            # Role, tool calls/kwargs (if any) and the marker appended on a cut
+            fixed = self._count_text_tokens_batch(
+                self._collect_text_fragments(message)[1:] + [_TRUNCATION_MARKER]
+            )
+            content_budget = (
+                int((max_tokens - sum(fixed[1:-1])) / self._message_multiplier(message))
+                - fixed[0]
+                - fixed[-1]
+            )
+            if content_budget <= 0:
+                return 0
+
+            total_tokens = self._count_text_tokens(content)
+            if total_tokens <= content_budget:
+                return len(content)
+
+            # Count-only encoders (runtoken) take no special-token arguments
+            encode = getattr(encoding, "encode_ordinary", None)
+            if encode is None:
+                if getattr(encoding, "count", None) is not None:
+                    encode = encoding.encode
+                else:
+                    encode = partial(encoding.encode, disallowed_special=())
+
+            # Encode only a prefix: 25% past where the content's own
+            # chars-per-token ratio says the budget runs out, growing it in
+            # the rare case that is still too short. Tokens well before the
+            # end of a prefix are the same as in the full encoding.
+            prefix_len = min(
+                len(content), len(content) * content_budget * 5 // (4 * total_tokens) + 64
+            )
+            tokens = encode(content[:prefix_len])
+            while len(tokens) <= content_budget and prefix_len < len(content):
+                prefix_len = min(len(content), prefix_len * 2)
+                tokens = encode(content[:prefix_len])
+
+            kept = tokens[:content_budget]
+            decode_bytes = getattr(encoding, "decode_bytes", None)
+            if decode_bytes is not None:
+                # A cut inside a multi-byte character drops that character
+                return len(decode_bytes(kept).decode("utf-8", "ignore"))
+            return len(encoding.decode(kept))
+        except Exception as e:
+            logger.warning(f"tiktoken encoding failed, truncating by estimate: {e}")
+            return max_tokens * 2
 
     def _try_compress_json(self, content: str, max_tokens: int) -> Optional[str]:
         """
@@ -493,23 +932,31 @@ class ContextManager:
             max_tokens: Maximum tokens for compressed content
 
         Returns:
-            Compressed JSON string if content is valid JSON, None otherwise
+            Compressed JSON string if content is a valid JSON array or object,
+            None for anything else (including scalar JSON values)
         """
+        # Only arrays and objects are worth compressing structurally; reject
+        # everything else (natural-language text above all) by peeking at the
+        # first non-whitespace character, without parsing or copying
+        if not _JSON_CONTAINER_START_RE.match(content):
+            return None
+
+        # Empty containers compress to themselves; skip the parse round trip
+        stripped = content.strip()
+        if stripped in ("[]", "{}"):
+            return stripped
+
         try:
             # Try to parse as JSON
-            data = json.loads(content.strip())
-        except (json.JSONDecodeError, ValueError):
+            data = orjson.loads(stripped)
+        except orjson.JSONDecodeError:
             # Not valid JSON, return None to use regular compression
             return None
 
-        # Compress based on data type
+        # Content starting with [ or { that parses is an array or an object
         if isinstance(data, list):
             return self._compress_json_array(data, max_tokens)
-        elif isinstance(data, dict):
-            return self._compress_json_object(data, max_tokens)
-        else:
-            # Simple value, keep as is
-            return json.dumps(data, ensure_ascii=False)
+        return self._compress_json_object(data, max_tokens)
 
     def _compress_json_array(self, array: list, max_tokens: int) -> str:
         """
@@ -522,36 +969,47 @@ class ContextManager:
         Returns:
             Compressed JSON array as string
         """
-        if not array:
-            return "[]"
-
-        # Calculate how many elements we can keep
-        # Start with all elements and remove middle ones if needed
-        compressed_array = array.copy()
-        
-        while len(compressed_array) > 2:
-            # Try current array
-            current_json = json.dumps(compressed_array, ensure_ascii=False)
-            tokens = self._count_text_tokens(current_json)
-            
-            if tokens <= max_tokens:
-                break
-            
-            # Remove middle element(s)
-            if len(compressed_array) <= 4:
-                # Keep first 2 and last 1
-                compressed_array = compressed_array[:2] + compressed_array[-1:]
+        n = len(array)
+        if n <= 2:
+            return _json_dumps(array)
+
+        # Middle elements are dropped first, one at a time from alternating
+        # sides of the gap, always keeping the first and last ones. Work out
+        # that removal order on indices alone, then add elements back from
+        # the outside in while they fit: only the elements that end up kept
+        # (plus the first one that doesn't fit) are serialized and tokenized,
+        # however long the array is.
+        prefix = n // 2
+        suffix = n - prefix - 1
+        removal_order = [prefix]
+        while prefix + suffix > 2:
+            if (prefix + suffix) // 2 < prefix:
+                prefix -= 1
+                removal_order.append(prefix)
             else:
-                # Keep first 2 and last 2, remove middle
-                mid = len(compressed_array) // 2
-                compressed_array.pop(mid)
-
-        # Final check - if still too large, keep only first and last
-        current_json = json.dumps(compressed_array, ensure_ascii=False)
-        if self._count_text_tokens(current_json) > max_tokens and len(compressed_array) > 2:
-            compressed_array = [compressed_array[0], compressed_array[-1]]
+                removal_order.append(n - suffix)
+                suffix -= 1
+
+        # Serialized elements are kept so the result is joined from them
+        # rather than serialized a second time
+        pieces: Dict[int, str] = {}
+
+        def cost(i: int) -> int:
+            # Element tokens plus one for the separator
+            pieces[i] = _json_dumps(array[i])
+            return self._count_text_tokens(pieces[i]) + 1
+
+        kept = [0, n - 1]
+        total_tokens = 1 + cost(0) + cost(n - 1)  # brackets, minus a separator
+        for i in reversed(removal_order):
+            element_tokens = cost(i)
+            if total_tokens + element_tokens > max_tokens:
+                break
+            total_tokens += element_tokens
+            kept.append(i)
 
-        return json.dumps(compressed_array, ensure_ascii=False)
+        kept.sort()
+        return "[" + ",".join(pieces[i] for i in kept) + "]"
 
     def _compress_json_object(self, obj: dict, max_tokens: int) -> str:
         """
@@ -567,30 +1025,34 @@ class ContextManager:
         if not obj:
             return "{}"
 
-        # Priority fields to keep (common important fields)
-        priority_fields = ['url', 'title', 'type', 'score', 'id', 'name', 'message', 'error']
-        
         # Start with priority fields
         compressed_obj = {}
-        for field in priority_fields:
+        for field in _PRIORITY_JSON_FIELDS:
             if field in obj:
                 compressed_obj[field] = obj[field]
 
-        # Add other fields if space allows
+        # Add other fields if space allows, costing each field once instead of
+        # re-serializing the growing object for every candidate. Each field is
+        # serialized once; the result is joined from those pieces.
+        priority_json = _json_dumps(compressed_obj)
+        pieces = [priority_json[1:-1]] if compressed_obj else []
+        current_tokens = self._count_text_tokens(priority_json)
         for key, value in obj.items():
             if key not in compressed_obj:
-                # Try adding this field
-                test_obj = compressed_obj.copy()
-                test_obj[key] = value
-                test_json = json.dumps(test_obj, ensure_ascii=False)
-                
-                if self._count_text_tokens(test_json) <= max_tokens:
-                    compressed_obj[key] = value
+                field_json = _json_dumps({key: value})
+                cost = (
+                    self._count_text_tokens(field_json)
+                    + 1  # separator
+                )
+
+                if current_tokens + cost <= max_tokens:
+                    pieces.append(field_json[1:-1])
+                    current_tokens += cost
                 else:
                     # No more space
                     break
 
-        return json.dumps(compressed_obj, ensure_ascii=False)
+        return "{" + ",".join(pieces) + "}"
 
     def _create_summary_message(self, messages: List[BaseMessage]) -> BaseMessage:
         """
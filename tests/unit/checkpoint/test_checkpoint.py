@@ -2,6 +2,8 @@
 # SPDX-License-Identifier: MIT
 
 import os
+import uuid
+from datetime import datetime
 from unittest.mock import MagicMock, patch
 
 import mongomock
@@ -439,6 +441,47 @@ def test_mongodb_insert_and_update_paths():
         collection.find_one = original_find_one
 
 
+def test_mongodb_keyset_pagination_with_tied_completed_at():
+    """Keyset pages must neither skip nor repeat rows sharing a completed_at."""
+    with patch("src.graph.checkpoint.MongoClient") as mock_mongo_client:
+        mock_client = mongomock.MongoClient()
+        mock_mongo_client.return_value = mock_client
+
+        manager = checkpoint.ChatStreamManager(checkpoint_saver=True, db_uri=MONGO_URL)
+
+        tied = datetime(2024, 1, 2, 12, 0, 0)
+        completed_ats = [datetime(2024, 1, 3), tied, tied, tied, datetime(2024, 1, 1)]
+        collection = manager.mongo_db.research_replays
+        for i, completed_at in enumerate(completed_ats):
+            collection.insert_one(
+                {
+                    "id": uuid.uuid4().hex,
+                    "thread_id": f"th{i}",
+                    "user_id": "u1",
+                    "is_completed": True,
+                    "completed_at": completed_at,
+                    "final_report": "report",
+                }
+            )
+
+        seen = []
+        after = None
+        # Bounded so that a cursor which never advances fails instead of hanging
+        for _ in range(len(completed_ats)):
+            page = manager.get_user_researches("u1", limit=2, after=after)
+            if not page:
+                break
+            assert all("final_report" not in row for row in page)
+            seen.extend(row["thread_id"] for row in page)
+            after = (page[-1]["completed_at"], page[-1]["id"])
+
+        assert len(seen) == len(completed_ats)
+        assert set(seen) == {f"th{i}" for i in range(len(completed_ats))}
+        # Newest first; the tie at the same completed_at comes out as one block
+        assert seen[0] == "th0"
+        assert seen[-1] == "th4"
+
+
 def test_postgresql_insert_update_and_error_paths():
     """Exercise PostgreSQL update, insert, and error/rollback branches."""
     calls = {"executed": []}
@@ -2,7 +2,10 @@
 # SPDX-License-Identifier: MIT
 
 import base64
+import json
 import os
+import uuid
+from datetime import datetime
 from unittest.mock import MagicMock, mock_open, patch
 
 import pytest
@@ -12,7 +15,13 @@ from langchain_core.messages import AIMessageChunk, ToolMessage
 from langgraph.types import Command
 
 from src.config.report_style import ReportStyle
-from src.server.app import _astream_workflow_generator, _make_event, app
+from src.server.app import (
+    _astream_workflow_generator,
+    _decode_research_cursor,
+    _encode_research_cursor,
+    _make_event,
+    app,
+)
 
 
 @pytest.fixture
@@ -47,6 +56,35 @@ class TestMakeEvent:
         assert result == expected
 
 
+class TestResearchCursor:
+    def test_round_trip(self):
+        research_id = uuid.uuid4().hex
+        completed_at = datetime(2024, 1, 2, 12, 30, 45, 123456)
+        cursor = _encode_research_cursor(
+            {"id": research_id, "completed_at": completed_at}
+        )
+        assert _decode_research_cursor(cursor) == (completed_at, research_id)
+
+    def test_encode_without_completed_at(self):
+        assert _encode_research_cursor({"id": uuid.uuid4().hex}) is None
+
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            "not base64!",
+            base64.urlsafe_b64encode(b"not json").decode("ascii"),
+            base64.urlsafe_b64encode(
+                json.dumps(["2024-01-01T00:00:00", "x"]).encode("utf-8")
+            ).decode("ascii"),
+        ],
+        ids=["bad_base64", "bad_json", "bad_uuid"],
+    )
+    def test_malformed_cursor_is_rejected(self, cursor):
+        with pytest.raises(HTTPException) as exc_info:
+            _decode_research_cursor(cursor)
+        assert exc_info.value.status_code == 400
+
+
 class TestTTSEndpoint:
     @patch.dict(
         os.environ,
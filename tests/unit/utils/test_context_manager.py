@@ -1,9 +1,46 @@
+from types import SimpleNamespace
+
 import pytest
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
 
+from src.utils import context_manager as context_manager_module
 from src.utils.context_manager import ContextManager
 
 
+class CountingEncoding:
+    """Fake encoder with one token per word that counts its encode calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, text, disallowed_special=()):
+        self.calls += 1
+        return text.split()
+
+
+class CharEncoding:
+    """Fake encoder with one token per character"""
+
+    def encode(self, text, disallowed_special=()):
+        return list(text)
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
+class CountOnlyEncoding:
+    """Fake count-only encoder (like runtoken) whose encode takes no keywords"""
+
+    def count(self, text):
+        return len(text)
+
+    def encode(self, text):
+        return list(text)
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
 class TestContextManager:
     """Test cases for ContextManager"""
 
@@ -141,6 +178,26 @@ class TestContextManager:
         # return the original messages
         assert len(compressed["messages"]) == 4
 
+    def test_fit_messages_to_budget_reports_fitted_token_count(self):
+        """Test fit_messages_to_budget returns the token count of its result"""
+        context_manager = ContextManager(token_limit=100000, preserve_prefix_message_count=1)
+        messages = [SystemMessage(content="You are a helpful assistant.")]
+        for i in range(5):
+            messages.append(AIMessage(content=f"Step {i} findings. " * 50))
+            messages.append(
+                ToolMessage(content="Detailed information. " * 100, tool_call_id=f"tool_{i}")
+            )
+
+        fitted, tokens = context_manager.fit_messages_to_budget(messages)
+        # Under the limit, the original list is returned untouched
+        assert fitted is messages
+        assert tokens == context_manager.count_tokens(messages)
+
+        fitted, tokens = context_manager.fit_messages_to_budget(messages, token_limit=500)
+        assert fitted[0] is messages[0]
+        assert tokens == context_manager.count_tokens(fitted)
+        assert tokens <= 500
+
     def test_count_message_tokens_with_additional_kwargs(self):
         """Test counting tokens for messages with additional kwargs"""
         context_manager = ContextManager(token_limit=1000)
@@ -181,3 +238,86 @@ class TestContextManager:
         text = "Hello world 这是一些中文"
         token_count = context_manager._count_text_tokens(text)
         assert token_count > 6
+
+    def test_shared_encoding_retries_after_failed_load(self, monkeypatch):
+        """Test that a failed encoding load is retried instead of cached"""
+        encoding = object()
+        attempts = []
+
+        def get_encoding(name):
+            attempts.append(name)
+            if len(attempts) == 1:
+                raise OSError("vocabulary download failed")
+            return encoding
+
+        monkeypatch.setattr(context_manager_module, "RUNTOKEN_AVAILABLE", False)
+        monkeypatch.setattr(context_manager_module, "TIKTOKEN_AVAILABLE", True)
+        monkeypatch.setattr(
+            context_manager_module,
+            "tiktoken",
+            SimpleNamespace(get_encoding=get_encoding),
+            raising=False,
+        )
+        monkeypatch.setattr(context_manager_module, "_SHARED_ENCODINGS", {})
+
+        get_shared_encoding = context_manager_module._get_shared_encoding
+        assert get_shared_encoding("test_encoding") is None
+        assert get_shared_encoding("test_encoding") is encoding
+        # Once loaded, the encoding is shared without loading again
+        assert get_shared_encoding("test_encoding") is encoding
+        assert len(attempts) == 2
+
+    def test_count_message_tokens_is_memoized_per_message(self):
+        """Test that a message is only tokenized once per ContextManager"""
+        context_manager = ContextManager(token_limit=1000)
+        message = HumanMessage(content="Hello, how are you?")
+        first = context_manager._count_message_tokens(message)
+
+        context_manager._compute_message_tokens = None  # would fail if called
+        assert context_manager._count_message_tokens(message) == first
+
+    def test_count_message_tokens_is_shared_across_managers(self):
+        """Test that a new ContextManager reuses counts from an earlier one"""
+        message = AIMessage(content="Shared between model calls")
+        first = ContextManager(token_limit=1000)._count_message_tokens(message)
+
+        context_manager = ContextManager(token_limit=1000)
+        context_manager._compute_message_tokens = None  # would fail if called
+        assert context_manager._count_message_tokens(message) == first
+
+    def test_count_text_tokens_caches_short_texts(self):
+        """Test that repeated short texts are only encoded once"""
+        context_manager = ContextManager(token_limit=1000)
+        context_manager._encoding = CountingEncoding()
+        assert context_manager._count_text_tokens("human") == 1
+        assert context_manager._count_text_tokens("human") == 1
+        assert context_manager._encoding.calls == 1
+
+    def test_truncate_message_content_fits_budget_with_encoder(self):
+        """Test that truncating dense text with an encoder stays within budget"""
+        context_manager = ContextManager(token_limit=1000)
+        context_manager._encoding = CharEncoding()
+        message = ToolMessage(content="这是一个测试文本" * 100, tool_call_id="test")
+        truncated = context_manager._truncate_message_content(message, 100)
+
+        assert truncated.content.endswith("... [truncated]")
+        assert 90 <= context_manager._compute_message_tokens(truncated) <= 100
+
+    def test_truncate_message_content_with_count_only_encoder(self):
+        """Test truncation with an encoder whose encode takes no keyword arguments"""
+        context_manager = ContextManager(token_limit=1000)
+        context_manager._encoding = CountOnlyEncoding()
+        message = ToolMessage(content="这是一个测试文本" * 100, tool_call_id="test")
+        truncated = context_manager._truncate_message_content(message, 100)
+
+        assert truncated.content.endswith("... [truncated]")
+        assert 90 <= context_manager._compute_message_tokens(truncated) <= 100
+
+    def test_count_text_tokens_caches_long_texts_by_hash(self):
+        """Test that repeated long texts are only encoded once"""
+        context_manager = ContextManager(token_limit=1000)
+        context_manager._encoding = CountingEncoding()
+        text = "Important data point. " * 1000
+        assert context_manager._count_text_tokens(text) == 3000
+        assert context_manager._count_text_tokens("".join(["Important data point. "] * 1000)) == 3000
+        assert context_manager._encoding.calls == 1
@@ -2,142 +2,174 @@
 # SPDX-License-Identifier: MIT
 
 import json
-import unittest
 
+import pytest
 from langchain_core.messages import ToolMessage
 
 from src.utils.context_manager import ContextManager
 
+TOOL_CALL_ID = "test_id"
+
+
+@pytest.fixture(scope="module")
+def context_manager():
+    return ContextManager(
+        token_limit=1000,
+        preserve_prefix_message_count=0,
+        enable_smart_summary=True,
+        sliding_window_size=5
+    )
+
+
+@pytest.fixture(scope="module")
+def large_array():
+    # Similar to web_search results
+    return [
+        {"url": f"https://example.com/{i}", "title": f"Title {i}", "score": 0.9}
+        for i in range(20)
+    ]
+
+
+@pytest.fixture(scope="module")
+def large_array_json(large_array):
+    return json.dumps(large_array, ensure_ascii=False)
+
+
+@pytest.fixture(scope="module")
+def large_object():
+    return {
+        "url": "https://example.com",
+        "title": "Important Title",
+        "score": 0.95,
+        "content": "Very long content " * 100,
+        "raw_content": "Even longer raw content " * 200,
+        "metadata": {"key1": "value1", "key2": "value2"}
+    }
 
-class TestContextManagerJSONCompression(unittest.TestCase):
-    """Test JSON compression in ContextManager"""
 
-    def setUp(self):
-        self.context_manager = ContextManager(
-            token_limit=1000,
-            preserve_prefix_message_count=0,
-            enable_smart_summary=True,
-            sliding_window_size=5
-        )
+@pytest.fixture(scope="module")
+def large_object_json(large_object):
+    return json.dumps(large_object, ensure_ascii=False)
 
-    def test_compress_json_array(self):
+
+@pytest.fixture(scope="module")
+def truncation_array():
+    return [
+        {"url": f"https://example.com/{i}", "title": f"Title {i}"}
+        for i in range(15)
+    ]
+
+
+@pytest.fixture(scope="module")
+def truncation_array_json(truncation_array):
+    return json.dumps(truncation_array, ensure_ascii=False)
+
+
+class TestContextManagerJSONCompression:
+    """Test JSON compression in ContextManager"""
+
+    def test_compress_json_array(self, context_manager, large_array, large_array_json):
         """Test that JSON arrays are compressed while preserving structure"""
-        # Create a large JSON array similar to web_search results
-        large_array = [
-            {"url": f"https://example.com/{i}", "title": f"Title {i}", "score": 0.9}
-            for i in range(20)
-        ]
-        json_content = json.dumps(large_array, ensure_ascii=False)
-        
-        # Create a ToolMessage with this content
-        tool_msg = ToolMessage(content=json_content, tool_call_id="test_id")
-        
+        tool_msg = ToolMessage(content=large_array_json, tool_call_id=TOOL_CALL_ID)
+
         # Compress the message
-        compressed_msg = self.context_manager._summarize_message(tool_msg, max_tokens=100)
-        
+        compressed_msg = context_manager._summarize_message(tool_msg, max_tokens=100)
+
         # Verify the compressed content is valid JSON
         try:
             compressed_data = json.loads(compressed_msg.content)
-            self.assertIsInstance(compressed_data, list)
-            # Should have fewer elements than original
-            self.assertLess(len(compressed_data), len(large_array))
-            # But should still have some elements
-            self.assertGreater(len(compressed_data), 0)
-            # First and last elements should be preserved
-            if len(compressed_data) >= 2:
-                self.assertEqual(compressed_data[0]["url"], large_array[0]["url"])
-                self.assertEqual(compressed_data[-1]["url"], large_array[-1]["url"])
         except json.JSONDecodeError as e:
-            self.fail(f"Compressed content is not valid JSON: {e}")
-
-    def test_compress_json_object(self):
+            pytest.fail(f"Compressed content is not valid JSON: {e}")
+        assert isinstance(compressed_data, list)
+        # Should have fewer elements than original
+        assert len(compressed_data) < len(large_array)
+        # But should still have some elements
+        assert len(compressed_data) > 0
+        # First and last elements should be preserved
+        if len(compressed_data) >= 2:
+            assert compressed_data[0]["url"] == large_array[0]["url"]
+            assert compressed_data[-1]["url"] == large_array[-1]["url"]
+
+    def test_compress_json_object(self, context_manager, large_object, large_object_json):
         """Test that JSON objects are compressed while preserving important fields"""
-        # Create a JSON object with many fields
-        large_object = {
-            "url": "https://example.com",
-            "title": "Important Title",
-            "score": 0.95,
-            "content": "Very long content " * 100,
-            "raw_content": "Even longer raw content " * 200,
-            "metadata": {"key1": "value1", "key2": "value2"}
-        }
-        json_content = json.dumps(large_object, ensure_ascii=False)
-        
-        # Create a ToolMessage with this content
-        tool_msg = ToolMessage(content=json_content, tool_call_id="test_id")
-        
+        tool_msg = ToolMessage(content=large_object_json, tool_call_id=TOOL_CALL_ID)
+
         # Compress the message
-        compressed_msg = self.context_manager._summarize_message(tool_msg, max_tokens=50)
-        
+        compressed_msg = context_manager._summarize_message(tool_msg, max_tokens=50)
+
         # Verify the compressed content is valid JSON
         try:
             compressed_data = json.loads(compressed_msg.content)
-            self.assertIsInstance(compressed_data, dict)
-            # Important fields should be preserved
-            self.assertIn("url", compressed_data)
-            self.assertEqual(compressed_data["url"], large_object["url"])
         except json.JSONDecodeError as e:
-            self.fail(f"Compressed content is not valid JSON: {e}")
-
-    def test_truncate_json_content(self):
+            pytest.fail(f"Compressed content is not valid JSON: {e}")
+        assert isinstance(compressed_data, dict)
+        # Important fields should be preserved
+        assert "url" in compressed_data
+        assert compressed_data["url"] == large_object["url"]
+
+    def test_truncate_json_content(
+        self, context_manager, truncation_array, truncation_array_json
+    ):
         """Test that truncation also preserves JSON structure"""
-        # Create a large JSON array
-        large_array = [
-            {"url": f"https://example.com/{i}", "title": f"Title {i}"}
-            for i in range(15)
-        ]
-        json_content = json.dumps(large_array, ensure_ascii=False)
-        
-        # Create a ToolMessage with this content
-        tool_msg = ToolMessage(content=json_content, tool_call_id="test_id")
-        
+        tool_msg = ToolMessage(content=truncation_array_json, tool_call_id=TOOL_CALL_ID)
+
         # Truncate the message
-        truncated_msg = self.context_manager._truncate_message_content(tool_msg, max_tokens=100)
-        
+        truncated_msg = context_manager._truncate_message_content(tool_msg, max_tokens=100)
+
         # Verify the truncated content is valid JSON
         try:
             truncated_data = json.loads(truncated_msg.content)
-            self.assertIsInstance(truncated_data, list)
-            # Should have fewer elements than original
-            self.assertLess(len(truncated_data), len(large_array))
         except json.JSONDecodeError as e:
-            self.fail(f"Truncated content is not valid JSON: {e}")
+            pytest.fail(f"Truncated content is not valid JSON: {e}")
+        assert isinstance(truncated_data, list)
+        # Should have fewer elements than original
+        assert len(truncated_data) < len(truncation_array)
+
+    def test_compress_json_array_keeps_first_and_last_when_over_budget(self, context_manager):
+        """Test that arrays too large even at three elements keep first and last"""
+        large_array = [{"content": f"item {i} " + "x" * 400} for i in range(3)]
+        compressed = context_manager._compress_json_array(large_array, max_tokens=10)
 
-    def test_non_json_content_unchanged(self):
+        compressed_data = json.loads(compressed)
+        assert compressed_data == [large_array[0], large_array[-1]]
+
+    def test_non_json_content_unchanged(self, context_manager):
         """Test that non-JSON content is processed normally"""
-        # Create a ToolMessage with non-JSON content
         non_json_content = "This is just plain text with some information."
-        tool_msg = ToolMessage(content=non_json_content, tool_call_id="test_id")
-        
+        tool_msg = ToolMessage(content=non_json_content, tool_call_id=TOOL_CALL_ID)
+
         # Compress the message
-        compressed_msg = self.context_manager._summarize_message(tool_msg, max_tokens=50)
-        
+        compressed_msg = context_manager._summarize_message(tool_msg, max_tokens=50)
+
         # Should be marked as summarized
-        self.assertIn("[SUMMARIZED]", compressed_msg.content)
+        assert "[SUMMARIZED]" in compressed_msg.content
+
+    def test_try_compress_json_rejects_non_container_content(self, context_manager):
+        """Test that only JSON arrays and objects are compressed as JSON"""
+        assert context_manager._try_compress_json("Key Findings: none", 50) is None
+        assert context_manager._try_compress_json("42", 50) is None
+        assert context_manager._try_compress_json("   ", 50) is None
+        assert context_manager._try_compress_json(' {"a": 1}', 50) == '{"a":1}'
 
-    def test_empty_json_array(self):
+    def test_empty_json_array(self, context_manager):
         """Test that empty JSON arrays are handled correctly"""
-        json_content = "[]"
-        tool_msg = ToolMessage(content=json_content, tool_call_id="test_id")
-        
-        compressed_msg = self.context_manager._summarize_message(tool_msg, max_tokens=50)
-        
-        # Should remain as empty array
-        self.assertEqual(compressed_msg.content, "[]")
+        tool_msg = ToolMessage(content="[]", tool_call_id=TOOL_CALL_ID)
 
-    def test_empty_json_object(self):
-        """Test that empty JSON objects are handled correctly"""
-        json_content = "{}"
-        tool_msg = ToolMessage(content=json_content, tool_call_id="test_id")
-        
-        compressed_msg = self.context_manager._summarize_message(tool_msg, max_tokens=50)
-        
-        # Should remain as empty object
-        self.assertEqual(compressed_msg.content, "{}")
+        compressed_msg = context_manager._summarize_message(tool_msg, max_tokens=50)
 
+        # Should remain as empty array
+        assert compressed_msg.content == "[]"
 
-if __name__ == "__main__":
-    unittest.main()
+    def test_empty_json_object(self, context_manager):
+        """Test that empty JSON objects are handled correctly"""
+        tool_msg = ToolMessage(content="{}", tool_call_id=TOOL_CALL_ID)
 
+        compressed_msg = context_manager._summarize_message(tool_msg, max_tokens=50)
 
+        # Should remain as empty object
+        assert compressed_msg.content == "{}"
 
+    def test_empty_json_with_whitespace(self, context_manager):
+        """Test that padded empty containers are returned stripped"""
+        assert context_manager._try_compress_json(" [] \n", 50) == "[]"
+        assert context_manager._try_compress_json("\t{}", 50) == "{}"